@@ -6,14 +6,14 @@ A Model Context Protocol server for intelligent PDF template editing.
 Provides tools to find and replace template fields in PDF documents.
 """
 
-import warnings
-warnings.filterwarnings("ignore", category=DeprecationWarning, module="importlib._bootstrap")
-
 import os
 import sys
 import logging
+import threading
 import yaml
-from typing import Dict, Optional
+from yaml_compat import SafeLoader
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 from fastmcp import FastMCP
 from pdf_template_editor import PDFTemplateEditor
 
@@ -26,25 +26,53 @@ logger = logging.getLogger(__name__)
 
 app = FastMCP("PDF Template Editor MCP Server")
 
+# LRU cache for parsed alias files:
+# {alias_file: (mtime, size, coord_to_alias, alias_to_coord)}.
+# Validated by mtime+size so unchanged files skip I/O and YAML parsing.
+# fastmcp runs sync tools in worker threads, so cache access is locked.
+_ALIAS_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, str], Dict[str, str]]]" = OrderedDict()
+_ALIAS_CACHE_SIZE = 128
+_ALIAS_CACHE_LOCK = threading.Lock()
+
+
+def load_alias_mapping(pdf_path: str, direction: str = "alias_to_coord") -> Dict[str, str]:
+    """Load alias mapping from YAML file next to PDF
 
-def load_alias_mapping(pdf_path: str) -> Dict[str, str]:
-    """Load alias mapping from YAML file next to PDF"""
+    The sidecar file stores coordinate_key -> alias; `direction` selects
+    which orientation to return ("alias_to_coord" or "coord_to_alias"),
+    so callers never have to re-reverse the dict themselves.
+    """
     # Convert to absolute path to handle relative paths correctly
     abs_pdf_path = os.path.abspath(pdf_path)
     base_name = os.path.splitext(abs_pdf_path)[0]
     alias_file = f"{base_name}.alias.yaml"
 
-    if not os.path.exists(alias_file):
+    try:
+        stat = os.stat(alias_file)
+    except OSError:
         return {}
 
+    with _ALIAS_CACHE_LOCK:
+        cached = _ALIAS_CACHE.get(alias_file)
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            _ALIAS_CACHE.move_to_end(alias_file)
+            return cached[2] if direction == "coord_to_alias" else cached[3]
+
     try:
         with open(alias_file, 'r', encoding='utf-8') as f:
-            alias_data = yaml.safe_load(f) or {}
+            coord_to_alias = yaml.load(f, Loader=SafeLoader) or {}
             # Reverse the mapping: coordinate_key -> alias to alias -> coordinate_key
-            return {v: k for k, v in alias_data.items()}
+            alias_to_coord = {v: k for k, v in coord_to_alias.items()}
     except Exception:
         return {}
 
+    with _ALIAS_CACHE_LOCK:
+        _ALIAS_CACHE[alias_file] = (stat.st_mtime, stat.st_size, coord_to_alias, alias_to_coord)
+        _ALIAS_CACHE.move_to_end(alias_file)
+        if len(_ALIAS_CACHE) > _ALIAS_CACHE_SIZE:
+            _ALIAS_CACHE.popitem(last=False)
+    return coord_to_alias if direction == "coord_to_alias" else alias_to_coord
+
 
 def reverse_alias_mapping(alias_map: Dict[str, str]) -> Dict[str, str]:
     """Create reverse mapping from alias to coordinate key"""
@@ -86,10 +114,8 @@ def list_pdf_fields(pdf_path: str) -> str:
         logger.info(f"Listing fields for PDF: {pdf_path}")
         validate_pdf_path(pdf_path)
 
-        # Load alias mapping (returns alias -> coordinate_key)
-        alias_to_coord = load_alias_mapping(pdf_path)
-        # Create reverse mapping: coordinate_key -> alias
-        coord_to_alias = {v: k for k, v in alias_to_coord.items()}
+        # Load alias mapping in the direction this tool needs
+        coord_to_alias = load_alias_mapping(pdf_path, direction="coord_to_alias")
 
         # Find all fields in PDF with Y sorting to maintain coordinate order
         with PDFTemplateEditor(pdf_path, verbose=False) as editor:
@@ -178,6 +204,8 @@ def set_pdf_fields(pdf_path: str, fields: Dict[str, str]) -> str:
 
 def main():
     """Main entry point for the MCP server"""
+    import warnings
+    warnings.filterwarnings("ignore", category=DeprecationWarning, module="importlib._bootstrap")
     try:
         logger.info("Starting PDF Template Editor MCP Server...")
         app.run()
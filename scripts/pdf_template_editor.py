@@ -1,96 +1,274 @@
 #!/usr/bin/env python3
 
-import warnings
-warnings.filterwarnings("ignore", category=DeprecationWarning, module="importlib._bootstrap")
-
-import fitz
 import re
 import os
+import sys
 import tempfile
 import shutil
+import threading
 import yaml
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from yaml_compat import SafeDumper
 from typing import List, Dict, Tuple, Optional
 
+# PyMuPDF is imported lazily: loading the MuPDF shared library costs
+# hundreds of ms, and importers that only need the pure-Python helpers
+# (key parsing, escaping) should not pay for it
+fitz = None
+
+
+def _load_fitz():
+    """Import PyMuPDF on first use"""
+    global fitz
+    if fitz is None:
+        import warnings
+        warnings.filterwarnings("ignore", category=DeprecationWarning, module="importlib._bootstrap")
+        import fitz
+
+
+# Matches keys produced by _serialize_key: p<page>_x<x1>y<y1>a<x2>b<y2>_<text>
+_KEY_RE = re.compile(r'^p(\d+)_x([-.\d]+)y([-.\d]+)a([-.\d]+)b([-.\d]+)_(.*)$', re.DOTALL)
+
+# Single-pass escape/unescape tables for YAML-safe key text
+_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t', '"': '\\"', "'": "\\'"
+})
+_UNESCAPE_RE = re.compile(r'\\([nrt"\'\\])')
+_UNESCAPE_MAP = {'n': '\n', 'r': '\r', 't': '\t', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _is_red_int(c: int) -> bool:
+    """Check if a packed 0xRRGGBB color int is red (R > 0.5, G/B < 0.3)"""
+    return (c & 0xFF0000) > 0x7F0000 and (c & 0x00FF00) < 0x004D00 and (c & 0x0000FF) < 0x4D
+
+
+# Precompiled color-filter predicates on the packed color int, looked up
+# once per page instead of re-deriving the test from the filter name
+_COLOR_FILTERS = {"red": _is_red_int}
+
+
+# Cap workers: page extraction saturates memory bandwidth well before CPU count
+_DEFAULT_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Parked fitz.Document objects from closed editors: {abspath: (mtime, doc)}.
+# An editor checks a document out on open and parks it again on close, so
+# back-to-back tool calls against the same PDF skip the xref/page-tree parse.
+# Guarded by a lock since fastmcp may serve requests concurrently.
+_DOC_CACHE: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+_DOC_CACHE_SIZE = 8
+_DOC_CACHE_LOCK = threading.Lock()
+
+
+def _checkout_doc(pdf_path: str):
+    """Reuse a parked document for this path if the file is unchanged"""
+    abs_path = os.path.abspath(pdf_path)
+    mtime = os.path.getmtime(abs_path)
+    with _DOC_CACHE_LOCK:
+        entry = _DOC_CACHE.pop(abs_path, None)
+    if entry is not None:
+        cached_mtime, doc = entry
+        if cached_mtime == mtime:
+            return doc
+        doc.close()
+    return fitz.open(pdf_path)
+
+
+def _checkin_doc(pdf_path: str, doc):
+    """Park an open document for reuse by the next editor on this path"""
+    # Never park unsaved mutations: a failed replace/remove bails out
+    # before _save_pdf, and reusing that doc would let a later successful
+    # save persist the phantom edits of the failed call
+    if doc.is_dirty:
+        doc.close()
+        return
+    abs_path = os.path.abspath(pdf_path)
+    try:
+        mtime = os.path.getmtime(abs_path)
+    except OSError:
+        doc.close()
+        return
+    to_close = []
+    with _DOC_CACHE_LOCK:
+        # A concurrent editor may have parked this path already; close the
+        # displaced document rather than dropping its handle
+        displaced = _DOC_CACHE.pop(abs_path, None)
+        if displaced is not None:
+            to_close.append(displaced[1])
+        _DOC_CACHE[abs_path] = (mtime, doc)
+        if len(_DOC_CACHE) > _DOC_CACHE_SIZE:
+            to_close.append(_DOC_CACHE.popitem(last=False)[1][1])
+    for stale in to_close:
+        stale.close()
+
+
+def _extract_page_templates(pdf_path: str, page_numbers: List[int], filter_by_color: str = None) -> List[Dict]:
+    """Process-pool worker: extract template spans from a range of pages"""
+    with PDFTemplateEditor(pdf_path) as editor:
+        results = []
+        for page_num in page_numbers:
+            results.extend(editor._find_page_templates(page_num, filter_by_color))
+        return results
+
 
 class PDFTemplateEditor:
     """PDF Template Editor using PyMuPDF for coordinate-based text replacement"""
 
     def __init__(self, pdf_path: str, verbose: bool = False):
+        _load_fitz()
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
         self.pdf_path = pdf_path
-        self.doc = fitz.open(pdf_path)
+        self.doc = _checkout_doc(pdf_path)
         self.verbose = verbose
+        self._fonts_dirty = False
+        # Per-page extraction caches, invalidated on save (the only point
+        # where page content visible to callers changes)
+        self._page_dict_cache: Dict[int, dict] = {}
+        self._textpages: Dict[int, object] = {}
 
 
-    def find_templates(self, mapping_file: Optional[str] = None, filter_by_color: str = None, sort_by_y: bool = False) -> List[Dict]:
+    def find_templates(self, mapping_file: Optional[str] = None, filter_by_color: str = None, sort_by_y: bool = False, workers: int = _DEFAULT_WORKERS) -> List[Dict]:
         """Find all text elements with their font information"""
-        results = []
+        page_count = len(self.doc)
+
+        if page_count >= 8 and workers > 1:
+            # Large document: split contiguous page ranges across a process
+            # pool; each worker re-opens the PDF (cheap next to extraction)
+            chunk = -(-page_count // workers)
+            page_ranges = [list(range(start, min(start + chunk, page_count)))
+                           for start in range(0, page_count, chunk)]
+            results = []
+            with ProcessPoolExecutor(max_workers=len(page_ranges)) as executor:
+                futures = [executor.submit(_extract_page_templates, self.pdf_path, page_range, filter_by_color)
+                           for page_range in page_ranges]
+                for future in futures:
+                    results.extend(future.result())
+        else:
+            results = []
+            for page_num in range(page_count):
+                results.extend(self._find_page_templates(page_num, filter_by_color))
 
-        for page_num in range(len(self.doc)):
+        # Sort by page (primary), Y coordinate (secondary) and X coordinate (tertiary) if requested
+        if sort_by_y and results:
+            # Decorate-sort-undecorate: plain tuple comparisons at C speed
+            # instead of a Python-level key lambda per comparison
+            keyed = [(r["page"], round(r["bbox"][1]), r["bbox"][0], i) for i, r in enumerate(results)]
+            keyed.sort()
+            results = [results[k[3]] for k in keyed]
+
+        if mapping_file and results:
+            self._save_mapping(results, mapping_file)
+
+        return results
+
+    def _page_dict(self, page_num: int) -> dict:
+        """Return the extracted text dict for a page, cached until save"""
+        cached = self._page_dict_cache.get(page_num)
+        if cached is None:
             page = self.doc[page_num]
-            page_dict = page.get_text("dict")
+            textpage = self._textpages.get(page_num)
+            if textpage is None:
+                # Skip image descriptors and ligature expansion; neither
+                # matters for template work and both inflate the extraction
+                flags = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES
+                textpage = page.get_textpage(flags=flags)
+                self._textpages[page_num] = textpage
+            cached = page.get_text("dict", textpage=textpage)
+            self._page_dict_cache[page_num] = cached
+        return cached
+
+    def _clear_page_caches(self):
+        """Drop cached extractions after page content has changed"""
+        self._page_dict_cache.clear()
+        self._textpages.clear()
+
+    def _find_page_templates(self, page_num: int, filter_by_color=None) -> List[Dict]:
+        """Extract template spans from a single page
+
+        filter_by_color is a registered filter name ("red") or a callable
+        predicate on the packed color int.
+        """
+        results = []
+        page_dict = self._page_dict(page_num)
+
+        # Bind hot callables locally; this loop runs once per span and the
+        # repeated attribute lookups add up on dense pages
+        append = results.append
+        get_rgb = self._get_color_rgb
+        serialize = self._serialize_key
+        predicate = filter_by_color if callable(filter_by_color) else _COLOR_FILTERS.get(filter_by_color)
+
+        for block in page_dict.get("blocks", []):
+            if "lines" not in block:
+                continue
 
-            for block in page_dict.get("blocks", []):
-                if "lines" not in block:
+            for line in block["lines"]:
+                spans = line.get("spans", [])
+
+                # Quick reject: most lines on a form are uniformly body text,
+                # so skip the whole line when no span in it passes the filter
+                if predicate is not None and not any(
+                        isinstance(s.get("color", 0), int) and predicate(s.get("color", 0))
+                        for s in spans):
                     continue
 
-                for line in block["lines"]:
-                    for span in line.get("spans", []):
-                        span_text = span.get("text", "").strip()
+                for span in spans:
+                    span_text = span.get("text", "").strip()
 
-                        if span_text:
-                            # Check color filter if specified
-                            if filter_by_color:
-                                color_rgb = self._get_color_rgb(span.get("color", 0))
-                                if filter_by_color == "red" and not self._is_red_color(color_rgb):
-                                    continue
+                    if span_text:
+                        # Check color filter on the packed int directly;
+                        # only surviving spans pay for the RGB conversion
+                        if predicate is not None:
+                            c = span.get("color", 0)
+                            if not (isinstance(c, int) and predicate(c)):
+                                continue
 
-                            bbox = span.get("bbox", [0, 0, 0, 0])
-                            # Use x1, y1, x2, y2 for coordinates
-                            x1, y1, x2, y2 = bbox
+                        bbox = span.get("bbox", [0, 0, 0, 0])
+                        # Use x1, y1, x2, y2 for coordinates
+                        x1, y1, x2, y2 = bbox
 
+                        append({
                             # Create unique key from coordinates and text
-                            unique_key = self._serialize_key(x1, y1, x2, y2, span_text, page_num)
-
-                            results.append({
-                                "key": unique_key,
-                                "text": span_text,
-                                "fontFamily": span.get("font", "Unknown"),
-                                "size": span.get("size", 12),
-                                "bbox": bbox,
-                                "page": page_num,
-                                "color": self._get_color_rgb(span.get("color", 0)),
-                                "matrix": span.get("transform", None)  # Transformation matrix
-                            })
+                            "key": serialize(x1, y1, x2, y2, span_text, page_num),
+                            "text": span_text,
+                            "fontFamily": span.get("font", "Unknown"),
+                            "size": span.get("size", 12),
+                            "bbox": bbox,
+                            "page": page_num,
+                            "color": get_rgb(span.get("color", 0)),
+                            "matrix": span.get("transform", None)  # Transformation matrix
+                        })
 
-        # Sort by page (primary), Y coordinate (secondary) and X coordinate (tertiary) if requested
-        if sort_by_y and results:
-            results.sort(key=lambda x: (x["page"], round(x["bbox"][1]), x["bbox"][0]))  # page, bbox[1] is Y, bbox[0] is X
+        return results
 
-        if mapping_file and results:
-            self._save_mapping(results, mapping_file)
+    def iter_templates(self, filter_by_color: str = None):
+        """Yield template elements page by page without building a list
 
-        return results
+        Streaming alternative to find_templates for callers that don't
+        need sorting or a mapping file.
+        """
+        for page_num in range(len(self.doc)):
+            yield from self._find_page_templates(page_num, filter_by_color)
 
     def get_all_templates(self, pattern: str = r'.*') -> List[str]:
-        """Get list of unique text elements"""
-        templates = set()
-        for template_data in self.find_templates(pattern):
-            templates.add(template_data["text"])
-        return sorted(list(templates))
+        """Get list of unique text elements matching pattern"""
+        regex = re.compile(pattern)
+        return sorted({item["text"] for item in self.iter_templates()
+                       if regex.search(item["text"])})
 
     def replace_templates(self, replacements: Dict[str, str], text_color: Tuple[float, float, float] = (0, 0, 0)) -> bool:
         """Replace elements using coordinate-based keys"""
         try:
             parsed_replacements = self._parse_replacements(replacements)
+            replacement_index = self._build_replacement_index(parsed_replacements)
             total_replaced = 0
 
             for page_num in range(len(self.doc)):
                 page = self.doc[page_num]
 
-                replacements_data = self._find_elements_by_coordinates(page, parsed_replacements)
+                replacements_data = self._find_elements_by_coordinates(page, replacement_index)
 
                 if replacements_data:
                     self._apply_replacements(page, replacements_data, text_color)
@@ -113,7 +291,7 @@ class PDFTemplateEditor:
 
             for page_num in range(len(self.doc)):
                 page = self.doc[page_num]
-                text_dict = page.get_text("dict")
+                text_dict = self._page_dict(page_num)
 
                 for block in text_dict["blocks"]:
                     if "lines" not in block:
@@ -147,23 +325,38 @@ class PDFTemplateEditor:
         """Parse replacement keys into coordinate data"""
         parsed = []
         for key, new_value in replacements.items():
+            # Unfilled entries in a mapping file come through as None
+            if new_value is None:
+                continue
             try:
                 x1, y1, x2, y2, original_text = self._deserialize_key(key)
                 unescaped_new_value = self._unescape_yaml_value(new_value)
 
                 parsed.append({
                     'key': key, 'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
-                    'original_text': original_text, 'new_value': unescaped_new_value
+                    # Interned so the hot text compare in the match path
+                    # short-circuits on identity for equal strings
+                    'original_text': sys.intern(original_text),
+                    'new_value': unescaped_new_value
                 })
             except ValueError as e:
                 if self.verbose:
                     print(f"Skipping invalid key {key}: {e}")
         return parsed
 
-    def _find_elements_by_coordinates(self, page, parsed_replacements: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _build_replacement_index(parsed_replacements: List[Dict]) -> Dict[Tuple[int, int, str], List[Dict]]:
+        """Bucket replacements on a 10pt grid keyed by (x-cell, y-cell, text)"""
+        index = {}
+        for repl_data in parsed_replacements:
+            bucket = (int(repl_data['x1'] // 10), int(repl_data['y1'] // 10), repl_data['original_text'])
+            index.setdefault(bucket, []).append(repl_data)
+        return index
+
+    def _find_elements_by_coordinates(self, page, replacement_index: Dict[Tuple[int, int, str], List[Dict]]) -> List[Dict]:
         """Find elements by exact coordinate and text match"""
         replacements_data = []
-        page_dict = page.get_text("dict")
+        page_dict = self._page_dict(page.number)
 
         for block in page_dict.get("blocks", []):
             if "lines" not in block:
@@ -171,67 +364,64 @@ class PDFTemplateEditor:
 
             for line in block["lines"]:
                 for span in line.get("spans", []):
-                    span_text = span.get("text", "").strip()
+                    # Interned to pair with the interned original_text values
+                    span_text = sys.intern(span.get("text", "").strip())
                     bbox = span.get("bbox", [0, 0, 0, 0])
 
                     # Use x1, y1, x2, y2 for coordinates
                     x1, y1, x2, y2 = bbox
 
-                    # Find matching replacement
-                    for repl_data in parsed_replacements:
-                        if self._coordinates_match(x1, y1, x2, y2, span_text, repl_data):
-                            replacements_data.append({
-                                'rect': fitz.Rect(bbox),
-                                'replacement': repl_data['new_value'],
-                                'font_size': span.get("size", 12),
-                                'font_name': span.get("font", "helv"),
-                                'color': self._get_color_rgb(span.get("color", 0)),
-                                'key': repl_data['key'],
-                                'matrix': span.get("transform", None)  # Original transformation matrix
-                            })
+                    # Look up candidates in the 3x3 grid neighborhood; the ±10px
+                    # tolerance can put a match in any adjacent 10pt cell
+                    bx, by = int(x1 // 10), int(y1 // 10)
+                    repl_match = None
+                    for dx in (-1, 0, 1):
+                        for dy in (-1, 0, 1):
+                            for repl_data in replacement_index.get((bx + dx, by + dy, span_text), ()):
+                                if self._coordinates_match(x1, y1, x2, y2, span_text, repl_data):
+                                    repl_match = repl_data
+                                    break
+                            if repl_match:
+                                break
+                        if repl_match:
                             break
 
+                    if repl_match:
+                        replacements_data.append({
+                            'rect': fitz.Rect(bbox),
+                            'replacement': repl_match['new_value'],
+                            'font_size': span.get("size", 12),
+                            'font_name': span.get("font", "helv"),
+                            'color': self._get_color_rgb(span.get("color", 0)),
+                            'key': repl_match['key'],
+                            'matrix': span.get("transform", None)  # Original transformation matrix
+                        })
+
         return replacements_data
 
     def _coordinates_match(self, x1: float, y1: float, x2: float, y2: float, text: str, repl_data: Dict) -> bool:
         """Check if coordinates and text match replacement data"""
-        # Allow small tolerance for coordinate differences (±10 pixels tolerance)
-        tolerance = 10.0
-
-        expected_x1 = repl_data['x1']
-        expected_y1 = repl_data['y1']
-        expected_x2 = repl_data['x2']
-        expected_y2 = repl_data['y2']
-
-        x1_match = abs(expected_x1 - x1) <= tolerance
-        y1_match = abs(expected_y1 - y1) <= tolerance
-        x2_match = abs(expected_x2 - x2) <= tolerance
-        y2_match = abs(expected_y2 - y2) <= tolerance
-        text_match = repl_data['original_text'] == text
-
-        matches = x1_match and y1_match and x2_match and y2_match and text_match
-
-        # if self.verbose and "Oripov7764" in text:
-        #     print(f"Debug match for:")
-        #     print(f"  Expected: x1={expected_x1:.2f}, y1={expected_y1:.2f}, x2={expected_x2:.2f}, y2={expected_y2:.2f}")
-        #     print(f"  Found:    x1={x1:.2f}, y1={y1:.2f}, x2={x2:.2f}, y2={y2:.2f}")
-        #     print(f"  Found text:   '{text}' (len={len(text)})")
-        #     print(f"  Text match: {text_match}, Coords match: {x1_match and y1_match and x2_match and y2_match}")
-        #     print(f"  Overall match: {matches}")
-
-        return matches
+        # Text compare first: it rejects almost all candidates instantly.
+        # Coordinates match when the Chebyshev distance of the corners is
+        # within the ±10px tolerance.
+        return (text == repl_data['original_text'] and
+                max(abs(x1 - repl_data['x1']), abs(y1 - repl_data['y1']),
+                    abs(x2 - repl_data['x2']), abs(y2 - repl_data['y2'])) <= 10.0)
 
     def _apply_replacements(self, page, replacements_data: List[Dict], text_color: Tuple[float, float, float]):
         """Apply replacements to page"""
         if self.verbose:
             print(f"Applying {len(replacements_data)} replacements on page {page.number}")
 
-        # Remove old text precisely
+        # Mark old text for removal (redaction annotations only)
         for data in replacements_data:
             if self.verbose:
                 print(f"Removing: {data['key']}")
             self._remove_specific_text(page, data)
 
+        # Apply all redactions in one pass, preserving graphics (checkboxes etc.)
+        page.apply_redactions(graphics=0)  # PDF_REDACT_LINE_ART_NONE = 0
+
         # Insert new text
         for data in replacements_data:
             if self.verbose:
@@ -240,50 +430,13 @@ class PDFTemplateEditor:
 
     def _remove_specific_text(self, page, data: Dict):
         """Remove specific text element precisely without affecting neighbors"""
+        # The rect is the span bbox found by _find_elements_by_coordinates, so
+        # there is no need to re-locate the text with page.search_for()
         rect = data['rect']
 
-        # Extract original text from key
-        key = data['key']
-        _, _, _, _, original_text = self._deserialize_key(key)
-
         if self.verbose:
-            print(f"  Removing text: '{original_text}' at {rect}")
-
-        # Search for the exact text in the exact location
-        text_instances = page.search_for(original_text)
-
-        if self.verbose:
-            print(f"  Found {len(text_instances)} instances of '{original_text}':")
-            for i, inst in enumerate(text_instances):
-                print(f"    Instance {i}: {inst}")
-
-        # Find the instance that matches our coordinates
-        target_rect = None
-        for i, instance_rect in enumerate(text_instances):
-            # Check if this instance overlaps with our target rect (increased tolerance)
-            if (abs(instance_rect.x0 - rect.x0) < 10 and
-                abs(instance_rect.y0 - rect.y0) < 10 and
-                abs(instance_rect.x1 - rect.x1) < 10 and
-                abs(instance_rect.y1 - rect.y1) < 10):
-                target_rect = instance_rect
-                if self.verbose:
-                    print(f"    Match found with instance {i}")
-                break
-
-        # If we found the exact match, redact only that area
-        if target_rect:
-            if self.verbose:
-                print(f"  Redacting area: {target_rect}")
-            page.add_redact_annot(target_rect)
-            # Apply redactions but preserve graphics (path elements like checkboxes)
-            page.apply_redactions(graphics=0)  # PDF_REDACT_LINE_ART_NONE = 0
-            if self.verbose:
-                print(f"  Redaction applied successfully")
-        else:
-            if self.verbose:
-                print(f"  ERROR: No matching text instance found for '{original_text}'")
-                print(f"  Target rect: {rect}")
-                print(f"  Available instances: {text_instances}")
+            print(f"  Redacting area: {rect}")
+        page.add_redact_annot(rect)
 
     def _insert_text_with_formatting(self, page, data: Dict, text_color: Tuple[float, float, float]):
         """Insert text with proper formatting"""
@@ -296,6 +449,25 @@ class PDFTemplateEditor:
         rect_height = rect.y1 - rect.y0
         position = (rect.x0, rect.y0 + rect_height * 0.8)
 
+        # Plain ASCII single-line values don't need the HTML/CSS layout
+        # engine; insert_text is far cheaper and helv covers ASCII fully
+        if text.isascii() and '\n' not in text and not any(c in text for c in '<>&'):
+            try:
+                page.insert_text(
+                    position,
+                    text,
+                    fontsize=font_size,
+                    fontname='helv',
+                    color=text_color
+                )
+                self._fonts_dirty = True
+                if self.verbose:
+                    print(f"  Inserted text: '{text}' with insert_text (plain)")
+                return
+            except Exception as e:
+                if self.verbose:
+                    print(f"  insert_text failed: {e}, trying htmlbox")
+
         # Use insert_htmlbox for automatic font detection
         try:
             # Convert color to CSS format
@@ -309,6 +481,7 @@ class PDFTemplateEditor:
                 text,
                 css=css
             )
+            self._fonts_dirty = True
             if self.verbose:
                 print(f"  Inserted text: '{text}' with htmlbox (auto font)")
         except Exception as e:
@@ -324,6 +497,7 @@ class PDFTemplateEditor:
                     fontname='helv',
                     color=text_color
                 )
+                self._fonts_dirty = True
                 if self.verbose:
                     print(f"  Fallback: inserted with helv font")
             except Exception as e2:
@@ -357,54 +531,24 @@ class PDFTemplateEditor:
 
     def _deserialize_key(self, key: str) -> Tuple[float, float, float, float, str]:
         """Deserialize key into coordinates and unescaped text"""
+        m = _KEY_RE.match(key)
+        if not m:
+            raise ValueError(f"Invalid key format: {key}")
         try:
-            # Split by '_' to separate page+coordinates from text
-            page_coord_part, escaped_text = key.split('_', 2)[-2:]  # Take last 2 parts
-
-            # Remove page part if it exists
-            if '_' in key:
-                coord_part = key.split('_')[1] if key.startswith('p') else key.split('_')[0]
-            else:
-                coord_part = key
-
-            # Parse coordinates: x...y...a...b...
-            x1_start = coord_part.find('x') + 1
-            y1_start = coord_part.find('y')
-            x2_start = coord_part.find('a')
-            y2_start = coord_part.find('b')
-
-            x1 = float(coord_part[x1_start:y1_start])
-            y1 = float(coord_part[y1_start+1:x2_start])
-            x2 = float(coord_part[x2_start+1:y2_start])
-            y2 = float(coord_part[y2_start+1:])
-
-            unescaped_text = self._unescape_yaml_value(escaped_text)
-            return x1, y1, x2, y2, unescaped_text
-
-        except (ValueError, IndexError) as e:
+            return (float(m[2]), float(m[3]), float(m[4]), float(m[5]),
+                    self._unescape_yaml_value(m[6]))
+        except ValueError as e:
             raise ValueError(f"Invalid key format: {key}") from e
 
     def _escape_yaml_value(self, text: str) -> str:
         """Escape special characters for YAML"""
-        # Order matters: escape backslashes first, then others
-        escaped = text.replace('\\', '\\\\')  # Escape backslashes first
-        escaped = escaped.replace('\n', '\\n')  # Escape newlines
-        escaped = escaped.replace('\r', '\\r')  # Escape carriage returns
-        escaped = escaped.replace('\t', '\\t')  # Escape tabs
-        escaped = escaped.replace('"', '\\"')  # Escape quotes
-        escaped = escaped.replace("'", "\\'")  # Escape single quotes
-        return escaped
+        # Single translate pass instead of six chained .replace() copies
+        return text.translate(_ESCAPE_TABLE)
 
     def _unescape_yaml_value(self, text: str) -> str:
         """Unescape special characters from YAML"""
-        # Order matters: unescape everything else first, then backslashes
-        unescaped = text.replace('\\n', '\n')  # Restore newlines
-        unescaped = unescaped.replace('\\r', '\r')  # Restore carriage returns
-        unescaped = unescaped.replace('\\t', '\t')  # Restore tabs
-        unescaped = unescaped.replace('\\"', '"')  # Restore quotes
-        unescaped = unescaped.replace("\\'", "'")  # Restore single quotes
-        unescaped = unescaped.replace('\\\\', '\\')  # Restore backslashes last
-        return unescaped
+        # Single regex pass instead of six chained .replace() copies
+        return _UNESCAPE_RE.sub(lambda m: _UNESCAPE_MAP[m[1]], text)
 
     def _save_mapping(self, results: List[Dict], mapping_file: str):
         """Save template mapping to YAML file in key:value format"""
@@ -415,44 +559,79 @@ class PDFTemplateEditor:
             mapping_data[item["key"]] = escaped_text
 
         try:
-            with open(mapping_file, 'w', encoding='utf-8') as f:
-                # Use default_style='"' to force quoted strings for consistency
-                # Use sort_keys=False to preserve insertion order (Python 3.7+)
-                yaml.dump(mapping_data, f,
-                         default_flow_style=False,
-                         allow_unicode=True,
-                         default_style='"',
-                         width=1000,  # Prevent line wrapping
-                         sort_keys=False)  # Preserve insertion order
+            if mapping_file.endswith('.json'):
+                # JSON sidecar for programmatic callers; orjson if installed
+                try:
+                    import orjson
+                    with open(mapping_file, 'wb') as f:
+                        f.write(orjson.dumps(mapping_data, option=orjson.OPT_INDENT_2))
+                except ImportError:
+                    import json
+                    with open(mapping_file, 'w', encoding='utf-8') as f:
+                        json.dump(mapping_data, f, ensure_ascii=False, indent=2)
+            else:
+                with open(mapping_file, 'w', encoding='utf-8') as f:
+                    # Use default_style='"' to force quoted strings for consistency
+                    # Use sort_keys=False to preserve insertion order (Python 3.7+)
+                    yaml.dump(mapping_data, f,
+                             Dumper=SafeDumper,
+                             default_flow_style=False,
+                             allow_unicode=True,
+                             default_style='"',
+                             width=1000,  # Prevent line wrapping
+                             sort_keys=False)  # Preserve insertion order
             if self.verbose:
                 print(f"Template mapping saved to: {mapping_file}")
         except Exception as e:
             if self.verbose:
                 print(f"Error saving mapping file: {e}")
 
-    def _save_pdf(self):
-        """Save PDF to temporary file and replace original"""
+    def save(self, subset: bool = True):
+        """Explicitly save the PDF, optionally skipping font subsetting"""
+        self._save_pdf(subset=subset)
+
+    def _save_pdf(self, subset: bool = True):
+        """Save PDF incrementally, falling back to a full rewrite"""
+        self._clear_page_caches()
+
+        # Optimize fonts before saving, but only if an insert touched fonts;
+        # subset_fonts() walks every font resource in the document
+        fonts_subsetted = False
+        if subset and self._fonts_dirty:
+            try:
+                self.doc.subset_fonts()
+                self._fonts_dirty = False
+                fonts_subsetted = True
+                if self.verbose:
+                    print("  Fonts optimized with subset_fonts()")
+            except Exception as e:
+                if self.verbose:
+                    print(f"  Font optimization failed: {e}")
+
+        # Incremental save appends only the delta and keeps the doc open;
+        # it is not possible after font subsetting, which needs a full save
+        if not fonts_subsetted:
+            try:
+                self.doc.save(self.pdf_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                return
+            except Exception as e:
+                if self.verbose:
+                    print(f"  Incremental save failed: {e}, doing full rewrite")
+
+        # Full atomic rewrite via tempfile
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
             temp_path = tmp.name
 
-        # Optimize fonts before saving
-        try:
-            self.doc.subset_fonts()
-            if self.verbose:
-                print("  Fonts optimized with subset_fonts()")
-        except Exception as e:
-            if self.verbose:
-                print(f"  Font optimization failed: {e}")
-
         self.doc.save(temp_path)
         self.doc.close()
         shutil.move(temp_path, self.pdf_path)
         self.doc = fitz.open(self.pdf_path)
 
     def close(self):
-        """Close the PDF document"""
+        """Release the PDF document (parked for reuse, not closed)"""
         if self.doc:
-            self.doc.close()
+            _checkin_doc(self.pdf_path, self.doc)
+            self.doc = None
 
     def __enter__(self):
         return self
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
-import argparse
-import yaml
 import sys
-from pathlib import Path
-from pdf_template_editor import PDFTemplateEditor
+from operator import itemgetter
+
+# yaml and pdf_template_editor are imported inside the functions that need
+# them so --help and argument-error runs don't pay for the heavy imports
 
 
 def generate_mapping(pdf_path: str, output_path: str, filter_color: str = None) -> bool:
@@ -19,6 +19,8 @@ def generate_mapping(pdf_path: str, output_path: str, filter_color: str = None)
     Returns:
         True if successful
     """
+    from pdf_template_editor import PDFTemplateEditor
+
     try:
         with PDFTemplateEditor(pdf_path) as editor:
             # Use find_templates to get template data with font info and save to file
@@ -29,10 +31,10 @@ def generate_mapping(pdf_path: str, output_path: str, filter_color: str = None)
                 print("No templates found in PDF")
                 return False
 
-            # Extract unique text elements for summary
-            texts = set()
-            for item in template_data:
-                texts.add(item["text"])
+            # Extract unique text elements for summary; map + itemgetter
+            # stays in C instead of a Python-level loop, and works just as
+            # well if template_data becomes a generator
+            texts = set(map(itemgetter("text"), template_data))
 
             print(f"Generated mapping file: {output_path}")
             print(f"Found {len(template_data)} elements ({len(texts)} unique texts):")
@@ -46,41 +48,136 @@ def generate_mapping(pdf_path: str, output_path: str, filter_color: str = None)
         return False
 
 
-def replace_templates(pdf_path: str, mapping_path: str) -> bool:
+# Plain scalars YAML's implicit resolver types as bool/null/value keys;
+# the fast parser bails on these so the rendered text matches YAML
+_TYPED_WORDS = frozenset((
+    'yes', 'Yes', 'YES', 'no', 'No', 'NO',
+    'true', 'True', 'TRUE', 'false', 'False', 'FALSE',
+    'on', 'On', 'ON', 'off', 'Off', 'OFF',
+    'Null', 'NULL', '='))
+
+
+def _load_simple_mapping(path: str):
+    """Parse a flat 'key: value' mapping file without a YAML parser
+
+    Handles the shape --generate emits: one scalar per line, optionally
+    quoted, with '#' comment lines and empty values as null. Returns
+    None as soon as a line needs real YAML (nesting, sequences, escape
+    sequences, trailing junk) so the caller can fall back.
+    """
+    out = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            s = line.rstrip('\n')
+            if not s.strip() or s.lstrip().startswith('#'):
+                continue
+            if s[0] in ' \t' or s.startswith('- '):
+                return None
+            key, sep, value = s.partition(':')
+            if not sep:
+                return None
+            key = key.strip()
+            value = value.strip()
+            if '\\' in key or '\\' in value:
+                return None
+            if key and key[0] in '"\'':
+                # Quoted key: a ':' inside it would have split mid-key
+                if len(key) >= 2 and key[-1] == key[0]:
+                    key = key[1:-1]
+                else:
+                    return None
+            elif key == '<<':
+                # Merge key: needs real YAML
+                return None
+            if value in ('', 'null', '~'):
+                out[key] = None
+            elif value[0] in '"\'':
+                inner = value[1:-1]
+                # The closing quote must end the line, and the interior may
+                # not contain the quote character itself (YAML doubles it)
+                if len(value) >= 2 and value[-1] == value[0] and value[0] not in inner:
+                    out[key] = inner
+                else:
+                    return None
+            elif value[0] in '[{&*!|>%@`':
+                # Flow collection, anchor/alias/tag, block scalar or
+                # reserved indicator: needs real YAML
+                return None
+            elif value == '-' or value.startswith('- '):
+                # Block sequence entry where a scalar belongs
+                return None
+            elif value in _TYPED_WORDS or (value[0] in '+-.0123456789' and ' ' not in value):
+                # The implicit resolver may type this (bool, octal/hex/
+                # underscored int, float, timestamp), so the literal string
+                # could render differently than what YAML would load
+                return None
+            elif value[0] == '#' or ' #' in value or '\t#' in value:
+                # Inline comment: YAML would truncate the value here
+                return None
+            else:
+                out[key] = value
+    return out
+
+
+def replace_templates(pdf_path: str, mapping_path: str, strict_yaml: bool = False) -> bool:
     """
     Replace templates in PDF using mapping file
 
     Args:
         pdf_path: Path to PDF file
         mapping_path: Path to mapping.yaml file
+        strict_yaml: Always use the full YAML parser
 
     Returns:
         True if successful
     """
+    from pdf_template_editor import PDFTemplateEditor
+
     try:
-        # Load mapping file
-        with open(mapping_path, 'r', encoding='utf-8') as f:
-            mapping = yaml.safe_load(f)
+        # Load mapping file. JSON mappings decode with orjson when it is
+        # installed; YAML tries the fast flat parser first and anything
+        # fancier falls through to real YAML
+        if mapping_path.endswith('.json'):
+            try:
+                import orjson
+                with open(mapping_path, 'rb') as f:
+                    mapping = orjson.loads(f.read())
+            except ImportError:
+                import json
+                with open(mapping_path, 'r', encoding='utf-8') as f:
+                    mapping = json.load(f)
+        else:
+            mapping = None
+            if not strict_yaml:
+                mapping = _load_simple_mapping(mapping_path)
+            if mapping is None:
+                import yaml
+                from yaml_compat import SafeLoader as _SafeLoader
+                with open(mapping_path, 'r', encoding='utf-8') as f:
+                    mapping = yaml.load(f, Loader=_SafeLoader)
 
         if not mapping:
             print("Empty mapping file")
             return False
 
-        # Use all mappings, including empty values
-        replacements = {k: v for k, v in mapping.items() if v is not None}
+        # The editor skips None (unfilled) values itself, so no filtered
+        # copy of the mapping is needed; just count the usable entries
+        num_values = sum(1 for v in mapping.values() if v is not None)
 
-        if not replacements:
+        if not num_values:
             print("No replacement values found in mapping file")
             return False
 
         # Apply replacements
         with PDFTemplateEditor(pdf_path, verbose=False) as editor:
-            success = editor.replace_templates(replacements)
+            success = editor.replace_templates(mapping)
 
             if success:
-                print(f"Successfully replaced {len(replacements)} templates:")
-                for template, value in replacements.items():
-                    print(f"  {template} -> {value}")
+                print(f"Successfully replaced {num_values} templates:")
+                # One buffered write instead of one print/syscall per entry
+                sys.stdout.write("\n".join(
+                    f"  {template} -> {value}"
+                    for template, value in mapping.items() if value is not None) + "\n")
             else:
                 print("Failed to replace templates")
 
@@ -101,6 +198,8 @@ def clear_templates(pdf_path: str) -> bool:
     Returns:
         True if successful
     """
+    from pdf_template_editor import PDFTemplateEditor
+
     try:
         with PDFTemplateEditor(pdf_path) as editor:
             # First, get all templates before removal
@@ -114,8 +213,7 @@ def clear_templates(pdf_path: str) -> bool:
 
             if success:
                 print(f"Successfully removed {len(templates)} template patterns:")
-                for template in templates:
-                    print(f"  - {template}")
+                sys.stdout.write("\n".join(f"  - {template}" for template in templates) + "\n")
             else:
                 print("Failed to remove templates")
 
@@ -126,43 +224,182 @@ def clear_templates(pdf_path: str) -> bool:
         return False
 
 
-def main():
-    """Main entry point for template processor"""
-    parser = argparse.ArgumentParser(description='PDF Template Processor')
-    parser.add_argument('pdf_path', help='Path to PDF file')
-
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument('--generate', metavar='OUTPUT',
-                      help='Generate mapping.yaml file')
-    group.add_argument('--replace', metavar='MAPPING',
-                      help='Replace templates using mapping.yaml file')
-    group.add_argument('--clear', action='store_true',
-                      help='Remove all templates from PDF')
-
-    parser.add_argument('--filter-color', choices=['red'],
-                      help='Filter elements by color (red)')
+def run_ops(pdf_path: str, ops_spec: str, filter_color: str = None, strict_yaml: bool = False) -> bool:
+    """
+    Run a comma-separated pipeline of operations against one PDF
 
-    args = parser.parse_args()
+    Steps look like 'generate:map.yaml,replace:map.yaml,clear'. The
+    editor's parked-document cache keeps the PDF parsed once across
+    steps instead of re-reading it per operation.
 
-    # Check if PDF file exists
-    if not Path(args.pdf_path).exists():
-        print(f"Error: PDF file not found: {args.pdf_path}")
-        sys.exit(1)
+    Args:
+        pdf_path: Path to PDF file
+        ops_spec: Comma-separated steps (generate:OUT, replace:MAPPING, clear)
+        filter_color: Optional color filter for generate steps
+        strict_yaml: Always use the full YAML parser for replace steps
 
+    Returns:
+        True if every step succeeded
+    """
+    for step in ops_spec.split(','):
+        name, _, arg = step.partition(':')
+        if name == 'generate' and arg:
+            ok = generate_mapping(pdf_path, arg, filter_color)
+        elif name == 'replace' and arg:
+            ok = replace_templates(pdf_path, arg, strict_yaml)
+        elif name == 'clear' and not arg:
+            ok = clear_templates(pdf_path)
+        else:
+            print(f"Error: invalid op '{step}' (expected generate:OUT, replace:MAPPING or clear)")
+            return False
+        if not ok:
+            return False
+    return True
+
+
+_USAGE = """\
+usage: template_processor.py [-h] (--generate OUTPUT | --replace MAPPING | --clear | --ops STEPS)
+                             [--filter-color {red}]
+                             pdf_path
+
+PDF Template Processor
+
+positional arguments:
+  pdf_path              Path to PDF file
+
+options:
+  -h, --help            show this help message and exit
+  --generate OUTPUT     Generate mapping.yaml file
+  --replace MAPPING     Replace templates using mapping.yaml file
+  --clear               Remove all templates from PDF
+  --ops STEPS           Run several steps against one open PDF, e.g.
+                        generate:map.yaml,replace:map.yaml,clear
+  --filter-color {red}  Filter elements by color (red)
+  --strict-yaml         Always parse the mapping file with the YAML parser
+  --profile             Profile the run with cProfile and print hotspots
+"""
+
+
+class _Args:
+    """Parsed command line options"""
+    def __init__(self):
+        self.pdf_path = None
+        self.generate = None
+        self.replace = None
+        self.clear = False
+        self.ops = None
+        self.filter_color = None
+        self.strict_yaml = False
+
+
+def _usage_error(message: str):
+    sys.stderr.write(_USAGE)
+    sys.stderr.write(f"error: {message}\n")
+    sys.exit(2)
+
+
+def parse_args(argv) -> _Args:
+    """Parse argv by hand; argparse construction costs tens of ms per run"""
+    args = _Args()
+    modes = 0
+    i = 0
+    n = len(argv)
+
+    def option_value(name: str, inline):
+        """Return an option's argument: inline (--opt=value) or the next token"""
+        nonlocal i
+        if inline is not None:
+            return inline
+        i += 1
+        if i >= n:
+            _usage_error(f'argument {name}: expected one argument')
+        return argv[i]
+
+    while i < n:
+        arg = argv[i]
+        # GNU-style --opt=value, as argparse accepted
+        inline = None
+        if arg.startswith('--') and '=' in arg:
+            arg, _, inline = arg.partition('=')
+        if arg in ('-h', '--help'):
+            sys.stdout.write(_USAGE)
+            sys.exit(0)
+        elif arg == '--generate':
+            args.generate = option_value('--generate', inline)
+            modes += 1
+        elif arg == '--replace':
+            args.replace = option_value('--replace', inline)
+            modes += 1
+        elif arg == '--clear':
+            if inline is not None:
+                _usage_error(f"argument --clear: ignored explicit argument '{inline}'")
+            args.clear = True
+            modes += 1
+        elif arg == '--ops':
+            args.ops = option_value('--ops', inline)
+            modes += 1
+        elif arg == '--strict-yaml':
+            if inline is not None:
+                _usage_error(f"argument --strict-yaml: ignored explicit argument '{inline}'")
+            args.strict_yaml = True
+        elif arg == '--filter-color':
+            choice = option_value('--filter-color', inline)
+            if choice != 'red':
+                _usage_error(f"argument --filter-color: invalid choice: '{choice}' (choose from 'red')")
+            args.filter_color = choice
+        elif arg.startswith('-'):
+            _usage_error(f'unrecognized arguments: {argv[i]}')
+        elif args.pdf_path is None:
+            args.pdf_path = arg
+        else:
+            _usage_error(f'unrecognized arguments: {arg}')
+        i += 1
+
+    if args.pdf_path is None:
+        _usage_error('the following arguments are required: pdf_path')
+    if modes != 1:
+        _usage_error('exactly one of --generate, --replace, --clear, --ops is required')
+    return args
+
+
+def _dispatch(argv):
+    """Parse argv and run the selected operation"""
+    args = parse_args(argv)
+
+    # Missing files surface as FileNotFoundError from the actual opens
+    # inside each operation; no need for extra stat() pre-checks here
     success = False
 
     if args.generate:
         success = generate_mapping(args.pdf_path, args.generate, args.filter_color)
     elif args.replace:
-        if not Path(args.replace).exists():
-            print(f"Error: Mapping file not found: {args.replace}")
-            sys.exit(1)
-        success = replace_templates(args.pdf_path, args.replace)
+        success = replace_templates(args.pdf_path, args.replace, args.strict_yaml)
     elif args.clear:
         success = clear_templates(args.pdf_path)
+    elif args.ops:
+        success = run_ops(args.pdf_path, args.ops, args.filter_color, args.strict_yaml)
 
     sys.exit(0 if success else 1)
 
 
+def main():
+    """Main entry point for template processor"""
+    # Handled here rather than in the __main__ block so the zipapp entry
+    # point (template_processor:main) honors --profile as well
+    argv = sys.argv[1:]
+    if "--profile" in argv:
+        argv = [a for a in argv if a != "--profile"]
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(_dispatch, argv)
+        finally:
+            profiler.dump_stats("template_processor.prof")
+            pstats.Stats("template_processor.prof").sort_stats("cumulative").print_stats(20)
+    else:
+        _dispatch(argv)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
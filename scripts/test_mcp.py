@@ -11,6 +11,7 @@ sys.path.insert(0, script_dir)
 
 from fastmcp import Client
 from pdf_editor_mcp_server import app
+from yaml_compat import SafeLoader as _SafeLoader
 
 async def test_mcp_server():
     """Test MCP server using in-memory transport"""
@@ -39,23 +40,25 @@ async def test_mcp_server():
             print("\n🔍 Testing list_pdf_fields...")
             result = await client.call_tool("list_pdf_fields", {"pdf_path": test_pdf})
 
-            # Parse YAML result
-            if result.data:
+            # Parse the YAML once (C loader) for the count and field list;
+            # the raw string is echoed as-is instead of being re-dumped
+            raw = result.data
+            if raw:
                 try:
-                    fields_dict = yaml.safe_load(result.data)
+                    fields_dict = yaml.load(raw, Loader=_SafeLoader)
                     print(f"✅ Found {len(fields_dict)} fields in PDF")
 
-                    # Show all fields
-                    print("All fields:")
-                    for i, (alias, value) in enumerate(fields_dict.items()):
-                        print(f"  {i+1}. {alias}: {value}")
+                    # Show all fields with one buffered write
+                    field_lines = [f"  {i+1}. {alias}: {value}"
+                                   for i, (alias, value) in enumerate(fields_dict.items())]
+                    sys.stdout.write("All fields:\n" + "\n".join(field_lines) + "\n")
 
-                    # Show full YAML output
-                    print("\nFull YAML output:")
-                    print(result.data)
+                    # Show full YAML output verbatim
+                    sys.stdout.write("\nFull YAML output:\n")
+                    sys.stdout.write(raw if raw.endswith("\n") else raw + "\n")
                 except yaml.YAMLError as e:
                     print(f"❌ Error parsing YAML: {e}")
-                    print(f"Raw result: {result.data}")
+                    print(f"Raw result: {raw}")
             else:
                 print("❌ No data returned")
 
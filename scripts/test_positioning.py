@@ -1,9 +1,80 @@
 #!/usr/bin/env python3
 
+import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pdf_template_editor import PDFTemplateEditor
 
+try:
+    import ahocorasick  # pyahocorasick, optional C extension
+except ImportError:
+    ahocorasick = None
+
+
+def build_template_matcher(templates):
+    """Return a callable yielding the templates found in a text
+
+    Uses Aho-Corasick when pyahocorasick is installed, which scans in
+    O(text + matches) regardless of template count; otherwise falls back
+    to a compiled regex alternation.
+    """
+    if not templates:
+        return lambda text: ()
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for template in templates:
+            automaton.add_word(template, template)
+        automaton.make_automaton()
+        return lambda text: (template for _, template in automaton.iter(text))
+    pattern = re.compile("|".join(map(re.escape, templates)))
+    return lambda text: (match.group() for match in pattern.finditer(text))
+
+
+def snapshot(pdf_path):
+    """Extract every page's spans once, as flat tuple records
+
+    Returns a list of (page_num, text, bbox, size, font, color) tuples.
+    The nested blocks/lines/spans dict from get_text("dict") is walked a
+    single time here and released immediately; the flat records are much
+    smaller to hold and cheaper to iterate than re-walking the dict per
+    pass. PyMuPDF documents are not thread-safe, so each worker opens its
+    own Document for its page range (fitz.open is cheap next to
+    extraction) and get_text then runs with the GIL released.
+    """
+    import fitz
+
+    def extract(doc, page_num):
+        page_dict = doc[page_num].get_text("dict")
+        return [(page_num, span.get("text", ""), span["bbox"],
+                 span.get("size", 12), span.get("font", "unknown"),
+                 span.get("color", 0))
+                for block in page_dict.get("blocks", [])
+                for line in block.get("lines", ())
+                for span in line.get("spans", ())]
+
+    def extract_range(page_numbers):
+        doc = fitz.open(pdf_path)
+        try:
+            return [record for i in page_numbers for record in extract(doc, i)]
+        finally:
+            doc.close()
+
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+        if page_count < 2:
+            return [record for i in range(page_count) for record in extract(doc, i)]
+
+    workers = min(os.cpu_count() or 1, page_count)
+    chunk = -(-page_count // workers)
+    page_ranges = [range(start, min(start + chunk, page_count))
+                   for start in range(0, page_count, chunk)]
+    with ThreadPoolExecutor(max_workers=len(page_ranges)) as executor:
+        pages = list(executor.map(extract_range, page_ranges))
+    return [record for page in pages for record in page]
+
+
 def test_positioning_accuracy():
     """Test positioning accuracy by checking coordinates before and after replacement"""
 
@@ -13,36 +84,35 @@ def test_positioning_accuracy():
     with PDFTemplateEditor(str(pdf_path)) as editor:
         print("=== BEFORE REPLACEMENT ===")
 
-        # Get original positions
+        # Get original positions; the matcher finds every template in a span
+        # with a single scan instead of one substring test per template
         templates = editor.get_all_templates()
+        find_templates_in = build_template_matcher(templates)
         original_positions = {}
 
-        for page_num in range(len(editor.doc)):
-            page = editor.doc[page_num]
-            page_dict = page.get_text("dict")
-
-            for block in page_dict.get("blocks", []):
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line.get("spans", []):
-                        span_text = span.get("text", "")
-                        span_bbox = span["bbox"]
-
-                        for template in templates:
-                            if template in span_text:
-                                original_positions[template] = {
-                                    'bbox': span_bbox,
-                                    'font_size': span.get("size", 12),
-                                    'font_name': span.get("font", "unknown"),
-                                    'color': span.get("color", 0),
-                                    'page': page_num
-                                }
-                                print(f"Template: {template}")
-                                print(f"  Position: {span_bbox}")
-                                print(f"  Font: {span.get('font', 'unknown')} @ {span.get('size', 12)}pt")
-                                print(f"  Color: {span.get('color', 0)}")
-                                print()
+        before = snapshot(str(pdf_path))
+
+        report = []
+        if templates:
+            for page_num, span_text, span_bbox, size, font, color in before:
+                for template in find_templates_in(span_text):
+                    original_positions[template] = {
+                        'bbox': span_bbox,
+                        'font_size': size,
+                        'font_name': font,
+                        'color': color,
+                        'page': page_num
+                    }
+                    report.append(
+                        f"Template: {template}\n"
+                        f"  Position: {span_bbox}\n"
+                        f"  Font: {font} @ {size}pt\n"
+                        f"  Color: {color}\n")
+        # One buffered write instead of five prints per template
+        sys.stdout.write("\n".join(report))
+
+        # Free the before-pass dicts ahead of replacement to cap peak memory
+        del before
 
         # Apply test replacements
         test_replacements = {template: f"[{template}_REPLACED]" for template in templates}
@@ -59,24 +129,16 @@ def test_positioning_accuracy():
         print("\n=== AFTER REPLACEMENT ===")
 
         # Check new positions
-        for page_num in range(len(editor.doc)):
-            page = editor.doc[page_num]
-            page_dict = page.get_text("dict")
-
-            for block in page_dict.get("blocks", []):
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line.get("spans", []):
-                        span_text = span.get("text", "")
-                        span_bbox = span["bbox"]
-
-                        if "_REPLACED]" in span_text:
-                            print(f"Replaced text: {span_text}")
-                            print(f"  New position: {span_bbox}")
-                            print(f"  Font: {span.get('font', 'unknown')} @ {span.get('size', 12)}pt")
-                            print(f"  Color: {span.get('color', 0)}")
-                            print()
+        report = []
+        for page_num, span_text, span_bbox, size, font, color in snapshot(str(pdf_path)):
+            if "_REPLACED]" in span_text:
+                report.append(
+                    f"Replaced text: {span_text}\n"
+                    f"  New position: {span_bbox}\n"
+                    f"  Font: {font} @ {size}pt\n"
+                    f"  Color: {color}\n")
+        sys.stdout.write("\n".join(report))
+        sys.stdout.flush()
 
 if __name__ == "__main__":
     test_positioning_accuracy()
\ No newline at end of file
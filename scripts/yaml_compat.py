@@ -0,0 +1,10 @@
+"""Shared libyaml-backed YAML loader/dumper with pure-Python fallback
+
+All YAML parsing and emitting in the project should go through these
+names so every call site gets the C implementations when available.
+"""
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper